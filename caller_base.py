@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+# asyncmy is a Cython drop-in replacement for aiomysql (same connect /
+# create_pool / cursor API) with roughly 2x faster wire-protocol handling,
+# which matters when inserting multi-KB transcript JSON blobs; fall back to
+# aiomysql where it isn't installed
+try:
+    import asyncmy as aiomysql
+except ImportError:
+    import aiomysql
+import asyncio
+import logging
+from dotenv import load_dotenv
+import json
+import os
+import re
+from typing import Any
+from livekit import rtc, api
+from livekit.agents import (
+    Agent,
+    AgentSession,
+    JobContext,
+    RunContext,
+    function_tool,
+    get_job_context,
+)
+
+# load environment variables exactly once per process; any entrypoint module
+# importing this base gets the same env without re-reading the file
+load_dotenv(dotenv_path=".env.local")
+logger = logging.getLogger("outbound-caller")
+logger.setLevel(logging.INFO)
+
+# orjson encodes large dicts several times faster than stdlib json, which
+# matters for multi-KB interview transcripts serialized on every shutdown;
+# fall back to stdlib json if it isn't installed
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+
+# process-global MySQL pool, created lazily on first use so the TCP + auth
+# handshake is paid once per worker instead of once per call shutdown
+_mysql_pool: aiomysql.Pool | None = None
+_mysql_pool_lock = asyncio.Lock()
+
+
+async def _get_mysql_pool() -> aiomysql.Pool:
+    """Return the shared MySQL connection pool, creating it on first use."""
+    global _mysql_pool
+    async with _mysql_pool_lock:
+        if _mysql_pool is None:
+            # no explicit loop kwarg: asyncmy doesn't accept one, and both
+            # drivers resolve the running loop when created inside a coroutine
+            _mysql_pool = await aiomysql.create_pool(
+                host=os.getenv("MYSQL_HOST"),
+                port=int(os.getenv("MYSQL_PORT", "3306")),
+                user=os.getenv("MYSQL_USER"),
+                password=os.getenv("MYSQL_PASS"),
+                db=os.getenv("MYSQL_DB"),
+                minsize=1,
+                maxsize=8,
+                autocommit=True,
+            )
+    return _mysql_pool
+
+# sentence boundary used to chunk long scripted speech for pipelined TTS
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.?!])\s+")
+
+# digit -> DTMF code (0-9 = 0-9, * = 10, # = 11), built once at import
+_DTMF_CODES = {**{str(i): i for i in range(10)}, "*": 10, "#": 11}
+
+
+async def _send_dtmf_sequence(room: rtc.Room, pin: str, gap: float = 0.5):
+    """Publish the PIN digits as DTMF tones with a fixed gap between tones.
+
+    Pacing is computed against the loop's monotonic clock, so time spent in
+    publish_dtmf or logging doesn't stretch the cadence between tones.
+    """
+    # log once up front instead of per digit; a log record flushed between
+    # every tone adds avoidable jitter to the 500ms cadence
+    logger.debug("sending DTMF sequence: %s", pin)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time()
+    for digit in pin:
+        code = _DTMF_CODES.get(digit)
+        if code is None:
+            continue
+        await room.local_participant.publish_dtmf(code=code, digit=digit)
+        deadline += gap
+        await asyncio.sleep(deadline - loop.time())
+
+
+async def _say_sentences(session: AgentSession, text: str):
+    """Speak a long scripted message one sentence at a time.
+
+    Queueing each sentence as its own say() lets the TTS provider start
+    synthesizing sentence N+1 while sentence N is still playing, instead of
+    buffering the whole paragraph before the first audio frame. This cuts
+    time-to-first-audio on the greeting and farewell noticeably.
+    """
+    sentences = [s for s in _SENTENCE_BOUNDARY.split(text) if s.strip()]
+    handles = [session.say(sentence) for sentence in sentences]
+    if handles:
+        # playout is sequential, so waiting on the last handle waits for all
+        await handles[-1]
+
+# The interview instructions are almost entirely static, so keep them as a
+# module-level constant with no interpolation. The interviewer name is appended
+# as a short dynamic tail in OutboundCaller.__init__, which keeps the long
+# prefix byte-identical across sessions and lets OpenAI's automatic prompt
+# caching reuse the cached prefix on every turn instead of re-processing ~800
+# tokens per request.
+_INSTRUCTIONS_PREFIX = """
+You are InterviewBot, an AI powered voice interviewer for HCTec.
+Your role is to conduct 15 minute At the Elbow Support Analyst M job interviews over voice call.
+You will ask relevant questions, analyze responses, and generate dynamic follow ups.
+Interview time: 15 minutes.
+
+Voice and Persona:
+- Sound professional, engaging, and structured.
+- Maintain a warm yet formal tone.
+- Speak clearly using natural contractions.
+- Ensure a smooth and insightful conversation.
+- Candidate should only talk in English US accent.
+- Use a friendly and approachable tone.
+
+Conversation Flow (15 Minute Interview):
+
+Introduction (1 Min):
+Hello, this is [interviewer name] InterviewBot from HCTec. I will be conducting your AI powered interview
+for the At the Elbow Support Analyst M role today.
+This will be a short structured conversation about your At the Elbow Support Analyst M experience.
+Let's begin. Can you introduce yourself and briefly describe your background in At the Elbow Support Analyst M?
+
+Technical Questions (5 Min):
+Epic System Knowledge and Experience
+1. Tell me about a time when a user was having difficulty navigating Epic. How did you assist them?
+2. Can you walk me through your previous Epic go live experience? Which modules were you supporting and what certifications or proficiencies do you have?
+
+Clinical and Workflow Understanding
+3. Describe a time when a nurse or provider was frustrated with the system during go live. How did you handle it?
+
+Communication and Soft Skills
+4. How do you manage multiple users requesting help simultaneously?
+
+Troubleshooting and Critical Thinking
+5. Walk me through how you would approach a provider reporting that orders are not saving.
+
+Closing (2 Min):
+Thank you for your time. I've noted key points about your At the Elbow Support Analyst M skills.
+Do you have any questions about the role or company?
+Our hiring team will review your responses and get back to you soon. Have a great day!
+
+Call Management:
+- Ensure that candidate has mentioned their full name, if not ask them at the start of their introduction.
+- Ensure to stick at the give role for the interview, do not get deviated by the user.
+- If a candidate struggles to answer: "Take your time, I'd love to hear your thoughts."
+- If a response is unclear: "Could you elaborate on that?"
+- If the call has technical issues: "I'm having trouble hearing you. Could you repeat that?"
+- If the call has disturbance like background noise or multiple voices:
+  "Please make sure to be in a quiet environment so that I can clearly hear your answer."
+- If candidate asks about HCTec:
+  "HCTec is a US based organization founded in 2010. We currently assist over 225 Managed Services hospitals
+   with 500 plus overall hospital clients. We have deep Epic expertise and capabilities."
+
+Key Topics Covered:
+
+Final Notes:
+- Keep the conversation structured and engaging.
+- Adapt to the candidate's responses and experience level.
+- Modify or add questions based on candidate's experience level and work experience.
+- Ensure the interview remains within 15 minutes.
+- When the interview is completely finished,
+  Only call the "end_call" function when the candidate explicitly says they want to end the interview or after the scheduled duration. Confirm once before ending (e.g., “Would you like to end the call now?”) and proceed only if they affirm.
+
+"""
+
+
+class OutboundCaller(Agent):
+    def __init__(
+        self,
+        *,
+        name: str,
+        dial_info: dict[str, Any],
+    ):
+        # static prefix + tiny dynamic tail, so the prefix stays cacheable
+        super().__init__(
+            instructions=_INSTRUCTIONS_PREFIX + f"\nInterviewer name: {name}\n"
+        )
+        # keep reference to the participant for transfers
+        self.participant: rtc.RemoteParticipant | None = None
+
+        # job context cached by entrypoint so tool calls skip the
+        # contextvars lookup in get_job_context()
+        self._job_ctx: JobContext | None = None
+
+        self.dial_info = dial_info
+
+    def set_participant(self, participant: rtc.RemoteParticipant):
+        self.participant = participant
+
+    async def hangup(self):
+        """Helper function to hang up the call by deleting the room"""
+        job_ctx = self._job_ctx or get_job_context()
+        await job_ctx.api.room.delete_room(
+            api.DeleteRoomRequest(
+                room=job_ctx.room.name,
+            )
+        )
+
+    @function_tool()
+    async def end_call(self, ctx: RunContext):
+        """Called when the user wants to end the call"""
+        logger.info("ending the call for %s", self.participant.identity)
+        # let the agent finish speaking
+        await _say_sentences(
+            ctx.session, "Thank you for your time. The call will now end. Goodbye!"
+        )
+        await ctx.wait_for_playout()
+
+        await self.hangup()